@@ -1,79 +1,110 @@
 import digitalocean
+import os
 import time
 import logging
 
+import requests
+from requests.adapters import HTTPAdapter, Retry
+
 logger = logging.getLogger(__name__)
 
 
 class DigitalOceanManager:
     """Manages Digital Ocean droplet operations."""
-    
+
     def __init__(self, api_token, droplet_id):
         self.api_token = api_token
         self.droplet_id = int(droplet_id)
+        # One keep-alive session for all API calls, so each status poll
+        # reuses the TCP+TLS connection instead of a fresh handshake
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(
+            pool_connections=4, pool_maxsize=4,
+            max_retries=Retry(total=3, backoff_factor=0.3,
+                              status_forcelist=[502, 503, 504])))
         self.manager = digitalocean.Manager(token=api_token)
+        self.manager._session = self._session
         self.droplet = None
+        # Cache the droplet status so frequent checks (monitor loop, web
+        # dashboard, proxy connections) don't each cost an API round-trip
+        self._status_cache = (None, 0.0)
+        self._status_ttl = float(os.getenv('DO_STATUS_TTL', '10'))
         self._load_droplet()
-    
+
     def _load_droplet(self):
         """Load the droplet object."""
         try:
             self.droplet = self.manager.get_droplet(self.droplet_id)
+            # Droplet objects get their own session; share the pooled one
+            self.droplet._session = self._session
             logger.info(f"Loaded droplet: {self.droplet.name} (ID: {self.droplet_id})")
         except Exception as e:
             logger.error(f"Failed to load droplet {self.droplet_id}: {e}")
             raise
-    
-    def is_running(self):
-        """Check if the droplet is currently running."""
+
+    def _cached_status(self):
+        """Get the droplet status, refreshing from the API when stale."""
+        status, fetched_at = self._status_cache
+        if status is not None and time.monotonic() - fetched_at < self._status_ttl:
+            return status
+
         self.droplet.load()
         status = self.droplet.status
+        self._status_cache = (status, time.monotonic())
+        return status
+
+    def _invalidate_status(self):
+        """Drop the cached status after a state-changing call."""
+        self._status_cache = (None, 0.0)
+
+    def is_running(self):
+        """Check if the droplet is currently running."""
+        status = self._cached_status()
         logger.debug(f"Droplet status: {status}")
         return status == 'active'
-    
+
     def start_droplet(self):
         """Start the droplet if it's not running."""
-        self.droplet.load()
-        
-        if self.droplet.status == 'active':
+        if self._cached_status() == 'active':
             logger.info("Droplet is already running")
             return True
-        
+
         logger.info(f"Starting droplet {self.droplet.name}...")
         try:
             self.droplet.power_on()
-            
+            self._invalidate_status()
+
             # Wait for the droplet to start (timeout after 5 minutes)
             timeout = 300
             start_time = time.time()
-            
+
             while time.time() - start_time < timeout:
                 self.droplet.load()
                 if self.droplet.status == 'active':
+                    self._status_cache = ('active', time.monotonic())
                     logger.info("Droplet started successfully")
                     # Give the Minecraft server some time to start
                     time.sleep(30)
                     return True
                 time.sleep(5)
-            
+
             logger.error("Timeout waiting for droplet to start")
             return False
-            
+
         except Exception as e:
             logger.error(f"Failed to start droplet: {e}")
             return False
-    
+
     def stop_droplet(self):
         """Stop the droplet if it's running."""
-        self.droplet.load()
-        
-        if self.droplet.status == 'off':
+        if self._cached_status() == 'off':
             logger.info("Droplet is already stopped")
             return True
-        
+
         logger.info(f"Stopping droplet {self.droplet.name}...")
         try:
             self.droplet.shutdown()
+            self._invalidate_status()
             logger.info("Shutdown command sent successfully")
             return True
         except Exception as e:
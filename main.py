@@ -2,6 +2,7 @@ import os
 import sys
 import time
 import logging
+import logging.handlers
 import threading
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
@@ -11,12 +12,18 @@ from minecraft_monitor import MinecraftMonitor
 from port_listener import TCPProxy
 from web_server import init_web_server, run_web_server
 
-# Setup logging
+# Setup logging. File writes are buffered and flushed in batches of 64
+# records (or immediately on ERROR) so routine logging doesn't hit disk
+# per line; logging.shutdown() flushes the remainder at exit.
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+_file_handler = logging.FileHandler('mcserver-manager.log')
+_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
-        logging.FileHandler('mcserver-manager.log'),
+        logging.handlers.MemoryHandler(capacity=64, flushLevel=logging.ERROR,
+                                       target=_file_handler),
         logging.StreamHandler(sys.stdout)
     ]
 )
@@ -70,14 +77,17 @@ class MCServerManager:
         self.startup_in_progress = False
         self.running = True
         self.server_ready = False
+        # Set to wake the monitoring loop early (e.g. on a new connection)
+        self._wake = threading.Event()
     
     def on_connection_attempt(self, address):
         """Called when someone tries to connect to the proxy."""
         logger.info(f"New connection from {address[0]}:{address[1]}")
         
-        # Update activity time
+        # Update activity time and recheck state right away
         self.last_activity_time = datetime.now()
-        
+        self._wake.set()
+
         # Check if droplet is running, start if not
         if not self.do_manager.is_running():
             logger.info("Droplet is offline. Starting droplet...")
@@ -137,7 +147,9 @@ class MCServerManager:
     
     def check_inactivity(self):
         """Check if the server has been inactive and should be shut down."""
-        if not self.do_manager.is_running():
+        # A successful TCP probe proves the server is up without spending a
+        # cloud API round-trip; only ask Digital Ocean when the port is closed
+        if not self.mc_monitor.is_port_open() and not self.do_manager.is_running():
             logger.debug("Droplet is not running, skipping inactivity check")
             self.server_ready = False
             return
@@ -187,6 +199,25 @@ class MCServerManager:
                     remaining = timeout_duration - inactive_duration
                     logger.info(f"No players online. Shutdown in {remaining.seconds // 60} minutes")
     
+    def _next_check_delay(self):
+        """How long the monitoring loop can sleep before the next check."""
+        coarse_interval = 300  # 5 minutes
+
+        # Only the empty-server countdown needs a precise wakeup: sleep
+        # until the shutdown deadline. Everything else (players online,
+        # droplet off) can wait for the coarse interval or a wakeup event.
+        # Gate on server_ready rather than is_running() so computing the
+        # delay never spends a Digital Ocean API call — with cycles
+        # minutes apart the status cache is always stale by now.
+        if (self.last_activity_time is not None
+                and self.server_ready
+                and self.tcp_proxy.get_active_connections() == 0):
+            deadline = self.last_activity_time + timedelta(minutes=self.inactivity_timeout)
+            remaining = (deadline - datetime.now()).total_seconds()
+            return max(5, min(remaining, coarse_interval))
+
+        return coarse_interval
+
     def run(self):
         """Main service loop."""
         logger.info("=== MC Server Manager Started ===")
@@ -212,11 +243,14 @@ class MCServerManager:
             else:
                 logger.info("Droplet is currently off")
             
-            # Main monitoring loop
+            # Main monitoring loop: sleep until the next interesting moment
+            # (the shutdown deadline, or a connection waking us up) instead
+            # of polling the external APIs every minute
             while self.running:
                 self.check_inactivity()
-                time.sleep(60)  # Check every minute
-                
+                self._wake.wait(timeout=self._next_check_delay())
+                self._wake.clear()
+
         except KeyboardInterrupt:
             logger.info("Received shutdown signal")
         finally:
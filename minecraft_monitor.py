@@ -1,5 +1,5 @@
 import logging
-from mcstatus import JavaServer
+import socket
 import time
 
 logger = logging.getLogger(__name__)
@@ -8,22 +8,62 @@ logger = logging.getLogger(__name__)
 class MinecraftMonitor:
     """Monitors Minecraft server for player activity."""
     
+    # How long one status query may be reused before asking again
+    STATUS_TTL = 5.0
+
     def __init__(self, server_ip, port=25565):
         self.server_ip = server_ip
         self.port = port
         self.server = None
-    
+        self._status_cache = (None, 0.0)
+
     def _get_server(self):
         """Get or create server connection."""
         if self.server is None:
-            self.server = JavaServer.lookup(f"{self.server_ip}:{self.port}")
+            # Deferred so service startup doesn't pay for mcstatus (and its
+            # dns/async dependency chain) before the first status query
+            from mcstatus import JavaServer
+            try:
+                socket.inet_aton(self.server_ip)
+            except OSError:
+                self.server = JavaServer.lookup(f"{self.server_ip}:{self.port}")
+            else:
+                # Literal IPs can't carry SRV records; skip the DNS query
+                # lookup() would make
+                self.server = JavaServer(self.server_ip, self.port)
         return self.server
-    
+
+    def _fetch_status(self):
+        """Query the server status, reusing a recent result if fresh.
+
+        is_server_online() and get_player_count() are typically called
+        back-to-back; sharing one query halves the round-trips. Raises on
+        failure so callers keep their existing error handling.
+        """
+        status, fetched_at = self._status_cache
+        if status is not None and time.monotonic() - fetched_at < self.STATUS_TTL:
+            return status
+
+        status = self._get_server().status()
+        self._status_cache = (status, time.monotonic())
+        return status
+
+    def is_port_open(self, timeout=2.0):
+        """Check if the server port accepts TCP connections.
+
+        Much cheaper than a status query or a cloud API call: a single
+        SYN/ACK round-trip with no protocol exchange.
+        """
+        try:
+            with socket.create_connection((self.server_ip, self.port), timeout=timeout):
+                return True
+        except OSError:
+            return False
+
     def is_server_online(self):
         """Check if the Minecraft server is online and responding."""
         try:
-            server = self._get_server()
-            status = server.status()
+            status = self._fetch_status()
             logger.debug(f"Server online check successful: {status.players.online} players")
             return True
         except Exception as e:
@@ -33,8 +73,7 @@ class MinecraftMonitor:
     def get_player_count(self):
         """Get the current number of players on the server."""
         try:
-            server = self._get_server()
-            status = server.status()
+            status = self._fetch_status()
             player_count = status.players.online
             logger.info(f"Current players: {player_count}")
             return player_count
@@ -1,16 +1,286 @@
-import socket
+import collections
 import logging
+import os
+import selectors
+import socket
 import threading
 import time
-import select
 
 logger = logging.getLogger(__name__)
 
+BUFFER_SIZE = 65536
+SPLICE_CHUNK = 65536
+PIPE_CAPACITY = 1 << 20
+# Fallback-path equivalent of a full pipe: stop reading a source once
+# this much data is queued for its peer
+MAX_OUTBUF = PIPE_CAPACITY
+HANDSHAKE_TIMEOUT = 5.0
+# Real handshakes are ~300 bytes; the length prefix is attacker-controlled,
+# so refuse anything claiming more than this
+MAX_HANDSHAKE_LEN = 4096
+
+# next_state values from the Minecraft handshake packet
+STATE_STATUS = 1
+STATE_LOGIN = 2
+
+# Kernel-side relaying: available on Linux with Python 3.10+
+HAS_SPLICE = hasattr(os, 'splice')
+if HAS_SPLICE:
+    import fcntl  # only needed to size the splice pipes
+
+
+class _Relay:
+    """Bidirectional data pump for one client <-> server connection pair.
+
+    Owned by the proxy's single I/O thread; all reads, writes and closes
+    happen on that thread, driven by selector readiness events.
+
+    On Linux each direction relays through a kernel pipe with splice(), so
+    bulk traffic never crosses into userspace. Elsewhere it falls back to
+    recv/send with a userspace buffer.
+    """
+
+    # Fixed attribute layout: skips the per-instance __dict__, which is
+    # most of a relay's footprint once traffic stays in kernel pipes
+    __slots__ = ('proxy', 'client_address', 'sockets', 'peers', 'outbuf',
+                 'closed', 'paused', 'events', 'pipes', 'pending', 'rbuf')
+
+    def __init__(self, proxy, client_socket, server_socket, client_address):
+        self.proxy = proxy
+        self.client_address = client_address
+        self.sockets = (client_socket, server_socket)
+        self.peers = {client_socket: server_socket, server_socket: client_socket}
+        # Bytes received but not yet written to each socket (fallback path)
+        self.outbuf = {client_socket: bytearray(), server_socket: bytearray()}
+        self.closed = False
+        # Sockets not being read because the data headed to their peer is
+        # backed up (full pipe / outbuf over the cap)
+        self.paused = set()
+        # Event mask each socket is currently registered with (0 = not
+        # registered); the single source of truth for selector state
+        self.events = {client_socket: 0, server_socket: 0}
+        self.pipes = None
+
+        if HAS_SPLICE:
+            # One pipe per direction, keyed by the destination socket
+            self.pipes = {}
+            self.pending = {client_socket: 0, server_socket: 0}
+            for sock in self.sockets:
+                r, w = os.pipe()
+                os.set_blocking(r, False)
+                os.set_blocking(w, False)
+                try:
+                    fcntl.fcntl(w, fcntl.F_SETPIPE_SZ, PIPE_CAPACITY)
+                except OSError:
+                    pass
+                self.pipes[sock] = (r, w)
+        else:
+            # Reused receive buffer for the copy path: recv_into avoids
+            # allocating a fresh bytes object per chunk
+            self.rbuf = memoryview(bytearray(BUFFER_SIZE))
+
+    def register(self):
+        """Register both sockets with the selector for reading."""
+        for sock in self.sockets:
+            self._update_events(sock)
+
+    def handle(self, sock, mask):
+        """Handle a readiness event on one of the pair's sockets."""
+        if self.closed:
+            return
+        if mask & selectors.EVENT_WRITE:
+            self._flush(sock)
+        if not self.closed and mask & selectors.EVENT_READ:
+            self._pump(sock)
+
+    def _pump(self, sock):
+        """Read from `sock` and forward to its peer."""
+        if HAS_SPLICE:
+            self._pump_splice(sock)
+        else:
+            self._pump_copy(sock)
+
+    def _pump_splice(self, sock):
+        """Move data from `sock` into its peer's pipe without copying."""
+        peer = self.peers[sock]
+        r, w = self.pipes[peer]
+
+        try:
+            n = os.splice(sock.fileno(), w, SPLICE_CHUNK,
+                          flags=os.SPLICE_F_MOVE | os.SPLICE_F_NONBLOCK)
+        except BlockingIOError:
+            if self.pending[peer]:
+                # Socket is readable but the pipe is full: stop reading
+                # until the peer drains it
+                self._pause(sock)
+                self._drain(peer)
+            return
+        except OSError as e:
+            logger.debug(f"Socket error during proxy: {e}")
+            self.close()
+            return
+
+        if n == 0:
+            # Connection closed
+            self.close()
+            return
+
+        self.pending[peer] += n
+        self._drain(peer)
+
+    def _drain(self, dst):
+        """Splice buffered pipe data out to `dst`."""
+        r, w = self.pipes[dst]
+
+        while self.pending[dst]:
+            try:
+                n = os.splice(r, dst.fileno(), self.pending[dst],
+                              flags=os.SPLICE_F_MOVE | os.SPLICE_F_NONBLOCK)
+            except BlockingIOError:
+                self._update_events(dst)
+                return
+            except OSError as e:
+                logger.debug(f"Socket error during proxy: {e}")
+                self.close()
+                return
+            self.pending[dst] -= n
+
+        self._backlog_cleared(dst)
+
+    def _pump_copy(self, sock):
+        """Fallback recv/send relay for platforms without splice()."""
+        peer = self.peers[sock]
+        try:
+            n = sock.recv_into(self.rbuf)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            logger.debug(f"Socket error during proxy: {e}")
+            self.close()
+            return
+
+        if n == 0:
+            # Connection closed
+            self.close()
+            return
+
+        data = self.rbuf[:n]
+        buf = self.outbuf[peer]
+        if buf:
+            # Peer is still draining a previous chunk, queue behind it
+            buf += data
+            if len(buf) >= MAX_OUTBUF:
+                self._pause(sock)
+            return
+
+        try:
+            sent = peer.send(data)
+        except BlockingIOError:
+            sent = 0
+        except OSError as e:
+            logger.debug(f"Socket error during proxy: {e}")
+            self.close()
+            return
+
+        if sent < n:
+            buf += data[sent:]
+            self._update_events(peer)
+            if len(buf) >= MAX_OUTBUF:
+                self._pause(sock)
+
+    def _flush(self, sock):
+        """Drain buffered data to `sock` once it becomes writable."""
+        if HAS_SPLICE:
+            self._drain(sock)
+            return
+
+        buf = self.outbuf[sock]
+        if buf:
+            try:
+                sent = sock.send(buf)
+            except BlockingIOError:
+                return
+            except OSError as e:
+                logger.debug(f"Socket error during proxy: {e}")
+                self.close()
+                return
+            del buf[:sent]
+
+        if not buf:
+            self._backlog_cleared(sock)
+
+    def _backlog(self, sock):
+        """Bytes waiting to be written to `sock`."""
+        if self.pipes is not None:
+            return self.pending[sock]
+        return len(self.outbuf[sock])
+
+    def _update_events(self, sock):
+        """Sync `sock`'s selector registration with its desired interest.
+
+        Desired interest is derived from relay state: read unless paused
+        by backpressure, write while a backlog is headed to this socket.
+        Registration is only touched when the mask actually changes, so
+        either direction can pause/resume independently without losing
+        the other's write interest.
+        """
+        mask = 0
+        if sock not in self.paused:
+            mask |= selectors.EVENT_READ
+        if self._backlog(sock):
+            mask |= selectors.EVENT_WRITE
+
+        current = self.events[sock]
+        if mask == current:
+            return
+        if not current:
+            self.proxy._selector.register(sock, mask, self)
+        elif not mask:
+            self.proxy._selector.unregister(sock)
+        else:
+            self.proxy._selector.modify(sock, mask, self)
+        self.events[sock] = mask
+
+    def _backlog_cleared(self, sock):
+        """All buffered data for `sock` was written; resume its peer."""
+        self._update_events(sock)
+        peer = self.peers[sock]
+        if peer in self.paused:
+            self.paused.discard(peer)
+            self._update_events(peer)
+
+    def _pause(self, sock):
+        """Stop reading `sock` until its peer's backlog drains."""
+        if sock not in self.paused:
+            self.paused.add(sock)
+            self._update_events(sock)
+
+    def close(self):
+        """Tear down both sides of the connection."""
+        if self.closed:
+            return
+        self.closed = True
+        for sock in self.sockets:
+            if self.events[sock]:
+                try:
+                    self.proxy._selector.unregister(sock)
+                except (KeyError, ValueError):
+                    pass
+            try:
+                sock.close()
+            except OSError:
+                pass
+        if self.pipes is not None:
+            for r, w in self.pipes.values():
+                os.close(r)
+                os.close(w)
+        self.proxy._connection_closed(self)
+
 
 class TCPProxy:
     """TCP proxy that forwards connections to the Minecraft server."""
-    
-    def __init__(self, listen_port=25565, target_host=None, target_port=25565, 
+
+    def __init__(self, listen_port=25565, target_host=None, target_port=25565,
                  on_connection_callback=None, get_server_ready_callback=None):
         self.listen_port = listen_port
         self.target_host = target_host
@@ -19,158 +289,304 @@ class TCPProxy:
         self.get_server_ready_callback = get_server_ready_callback
         self.running = False
         self.server_socket = None
-        self.listener_thread = None
+        self.io_thread = None
+        # Only the I/O thread mutates this; readers see a plain int
         self.active_connections = 0
-        self.connection_lock = threading.Lock()
-    
+        self._selector = None
+        self._pending = collections.deque()
+        # Self-pipe that other threads poke to interrupt the selector
+        self._wakeup_r = None
+        self._wakeup_w = None
+        # Resolved (host, port) of the target, cached across connections
+        self._target_addr = None
+
     def start(self):
         """Start the proxy server."""
         if self.running:
             logger.warning("Proxy is already running")
             return
-        
+
         self.running = True
-        self.listener_thread = threading.Thread(target=self._listen, daemon=True)
-        self.listener_thread.start()
+        try:
+            self._resolve_target()
+        except OSError as e:
+            # Not fatal: connection setup retries the lookup
+            logger.warning(f"Could not resolve {self.target_host}: {e}")
+        self.io_thread = threading.Thread(target=self._io_loop, daemon=True)
+        self.io_thread.start()
         logger.info(f"TCP Proxy started on port {self.listen_port}, forwarding to {self.target_host}:{self.target_port}")
-    
+
     def stop(self):
         """Stop the proxy server."""
         self.running = False
-        if self.server_socket:
+        self._wake()
+        logger.info("TCP Proxy stopped")
+
+    def _wake(self):
+        """Interrupt the selector so the I/O loop rechecks its state."""
+        if self._wakeup_w:
             try:
-                self.server_socket.close()
-            except:
+                self._wakeup_w.send(b'\x00')
+            except OSError:
                 pass
-        logger.info("TCP Proxy stopped")
-    
+
     def get_active_connections(self):
         """Get the current number of active connections."""
-        with self.connection_lock:
-            return self.active_connections
-    
-    def _listen(self):
-        """Main listening loop."""
+        return self.active_connections
+
+    def _resolve_target(self):
+        """Resolve the target host once and reuse the address afterwards."""
+        if self._target_addr is None:
+            info = socket.getaddrinfo(self.target_host, self.target_port,
+                                      socket.AF_INET, socket.SOCK_STREAM)
+            self._target_addr = info[0][4]
+        return self._target_addr
+
+    def _open_listener(self):
+        """Create and register the listening socket."""
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Lets a replacement process bind while old connections drain, and
+        # allows kernel-balanced multi-instance listening if ever needed
+        if hasattr(socket, 'SO_REUSEPORT'):
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self.server_socket.bind(('0.0.0.0', self.listen_port))
+        self.server_socket.listen(128)
+        self.server_socket.setblocking(False)
+        # data=None marks the listener; everything else carries its relay
+        self._selector.register(self.server_socket, selectors.EVENT_READ, None)
+        logger.info(f"Proxy listening on port {self.listen_port}")
+
+    def _accept(self):
+        """Accept pending clients and kick off per-connection setup."""
+        while self.running:
+            try:
+                client_socket, address = self.server_socket.accept()
+            except BlockingIOError:
+                return
+            except OSError as e:
+                if self.running:
+                    logger.error(f"Error accepting connection: {e}")
+                return
+
+            logger.info(f"Connection from {address[0]}:{address[1]}")
+
+            # Minecraft traffic is small latency-sensitive packets;
+            # don't let Nagle hold them back
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            # Set up this connection in a short-lived thread; once the
+            # backend is connected, the shared I/O loop takes over
+            connection_thread = threading.Thread(
+                target=self._handle_connection,
+                args=(client_socket, address),
+                daemon=True
+            )
+            connection_thread.start()
+
+    @staticmethod
+    def _parse_varint(buf, pos):
+        """Decode a Minecraft varint from `buf` at `pos`.
+
+        Returns (value, new_pos). Raises IndexError if the buffer ends
+        mid-varint so callers can read more bytes and retry.
+        """
+        value = 0
+        for i in range(5):
+            byte = buf[pos + i]
+            value |= (byte & 0x7F) << (7 * i)
+            if not byte & 0x80:
+                return value, pos + i + 1
+        raise ValueError("varint too long")
+
+    def _classify_handshake(self, client_socket):
+        """Read the client's handshake packet and classify the connection.
+
+        Returns (consumed_bytes, next_state) where next_state is
+        STATE_STATUS for a server-list ping, STATE_LOGIN for a join, or
+        None if no valid handshake arrived (such connections are dropped).
+        The consumed bytes must be replayed to the backend before proxying.
+        """
+        buf = bytearray()
+        # Absolute deadline: a trickling sender can't reset the clock by
+        # delivering one byte per recv timeout
+        deadline = time.monotonic() + HANDSHAKE_TIMEOUT
+
+        def fill(n):
+            while len(buf) < n:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ValueError("handshake timed out")
+                client_socket.settimeout(remaining)
+                chunk = client_socket.recv(4096)
+                if not chunk:
+                    raise ValueError("connection closed during handshake")
+                buf.extend(chunk)
+
         try:
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server_socket.bind(('0.0.0.0', self.listen_port))
-            self.server_socket.listen(10)
-            self.server_socket.settimeout(1.0)
-            
-            logger.info(f"Proxy listening on port {self.listen_port}")
-            
-            while self.running:
+            fill(1)
+            if buf[0] == 0xFE:
+                # Legacy (pre-1.7) server list ping
+                return bytes(buf), STATE_STATUS
+
+            # Packet length prefix, then the full handshake packet
+            while True:
                 try:
-                    client_socket, address = self.server_socket.accept()
-                    logger.info(f"Connection from {address[0]}:{address[1]}")
-                    
-                    # Trigger callback to ensure server is ready
-                    if self.on_connection_callback:
-                        self.on_connection_callback(address)
-                    
-                    # Handle this connection in a new thread
-                    connection_thread = threading.Thread(
-                        target=self._handle_connection,
-                        args=(client_socket, address),
-                        daemon=True
-                    )
-                    connection_thread.start()
-                    
-                except socket.timeout:
-                    continue
-                except Exception as e:
-                    if self.running:
-                        logger.error(f"Error accepting connection: {e}")
-        
+                    length, pos = self._parse_varint(buf, 0)
+                    break
+                except IndexError:
+                    fill(len(buf) + 1)
+            if length > MAX_HANDSHAKE_LEN:
+                # Bogus length prefix; don't buffer whatever it promises
+                raise ValueError(f"handshake claims {length} bytes")
+            fill(pos + length)
+
+            packet_id, p = self._parse_varint(buf, pos)
+            if packet_id != 0x00:
+                return bytes(buf), None
+            _protocol, p = self._parse_varint(buf, p)
+            addr_len, p = self._parse_varint(buf, p)
+            p += addr_len + 2  # server address string + unsigned short port
+            next_state, _ = self._parse_varint(buf, p)
+            return bytes(buf), next_state
+
+        except (OSError, ValueError, IndexError) as e:
+            logger.debug(f"Could not parse handshake: {e}")
+            return bytes(buf), None
+
+    def _connect_target(self):
+        """Open a connection to the Minecraft server, or return None."""
+        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        server_socket.settimeout(10.0)
+        try:
+            server_socket.connect(self._resolve_target())
+            logger.info(f"Connected to Minecraft server at {self.target_host}:{self.target_port}")
+            return server_socket
         except Exception as e:
-            logger.error(f"Failed to start proxy: {e}")
-        finally:
-            if self.server_socket:
-                self.server_socket.close()
-    
+            logger.error(f"Failed to connect to Minecraft server: {e}")
+            # The cached address may be stale; re-resolve next attempt
+            self._target_addr = None
+            server_socket.close()
+            return None
+
     def _handle_connection(self, client_socket, client_address):
-        """Handle a single client connection by proxying to the target server."""
+        """Set up a single client connection and hand it to the I/O loop."""
         server_socket = None
-        
-        with self.connection_lock:
-            self.active_connections += 1
-            logger.info(f"Active connections: {self.active_connections}")
-        
         try:
-            # Wait for the Minecraft server to be ready
-            if self.get_server_ready_callback:
-                logger.info("Waiting for Minecraft server to be ready...")
-                if not self.get_server_ready_callback():
-                    logger.error("Server did not become ready, closing client connection")
+            # Peek at the handshake so server-list pings (multiplayer menu
+            # refreshes) don't boot the droplet
+            handshake, next_state = self._classify_handshake(client_socket)
+
+            if next_state == STATE_STATUS:
+                # Answer only if the server is already up; never wake it
+                server_socket = self._connect_target()
+                if server_socket is None:
+                    logger.debug("Status ping while server is down, dropping")
                     client_socket.close()
                     return
-            
-            # Connect to the actual Minecraft server
-            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            server_socket.settimeout(10.0)
-            
-            try:
-                server_socket.connect((self.target_host, self.target_port))
-                logger.info(f"Connected to Minecraft server at {self.target_host}:{self.target_port}")
-            except Exception as e:
-                logger.error(f"Failed to connect to Minecraft server: {e}")
+            elif next_state is None:
+                # Not a Minecraft handshake (port scan, health probe,
+                # stray bytes): close without waking anything
+                logger.debug(f"Dropping {client_address[0]}:{client_address[1]} without a valid handshake")
                 client_socket.close()
                 return
-            
-            # Set sockets to non-blocking for select
+            else:
+                # A well-formed handshake headed for login (or transfer,
+                # or a future state the backend should judge).
+                # Trigger callback to ensure server is ready; runs here
+                # rather than on the accept path so a droplet boot doesn't
+                # stall the event loop or other clients
+                if self.on_connection_callback:
+                    self.on_connection_callback(client_address)
+
+                # Wait for the Minecraft server to be ready
+                if self.get_server_ready_callback:
+                    logger.info("Waiting for Minecraft server to be ready...")
+                    if not self.get_server_ready_callback():
+                        logger.error("Server did not become ready, closing client connection")
+                        client_socket.close()
+                        return
+
+                server_socket = self._connect_target()
+                if server_socket is None:
+                    client_socket.close()
+                    return
+
+            # Replay the handshake bytes consumed above, then hand both
+            # sockets to the event loop, which owns them from here
+            if handshake:
+                server_socket.sendall(handshake)
             client_socket.setblocking(False)
             server_socket.setblocking(False)
-            
-            # Proxy data between client and server
-            self._proxy_data(client_socket, server_socket, client_address)
-            
+            self._pending.append((client_socket, server_socket, client_address))
+            self._wake()
+
         except Exception as e:
             logger.error(f"Error handling connection from {client_address}: {e}")
-        finally:
-            if client_socket:
-                try:
-                    client_socket.close()
-                except:
-                    pass
-            if server_socket:
-                try:
-                    server_socket.close()
-                except:
-                    pass
-            
-            with self.connection_lock:
-                self.active_connections -= 1
-                logger.info(f"Connection closed. Active connections: {self.active_connections}")
-    
-    def _proxy_data(self, client_socket, server_socket, client_address):
-        """Proxy data bidirectionally between client and server."""
-        sockets = [client_socket, server_socket]
-        
+            for sock in (client_socket, server_socket):
+                if sock:
+                    try:
+                        sock.close()
+                    except OSError:
+                        pass
+
+    def _io_loop(self):
+        """Single-threaded event loop that accepts clients and relays data."""
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        # data=None marks control sockets (listener, wakeup pipe)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ, None)
+
         try:
+            self._open_listener()
+
+            # Blocks until traffic, a new connection handoff, or stop();
+            # all of those wake the selector, so no polling timeout needed
             while self.running:
-                readable, _, exceptional = select.select(sockets, [], sockets, 1.0)
-                
-                if exceptional:
-                    logger.debug("Socket exception, closing connection")
-                    break
-                
-                for sock in readable:
-                    try:
-                        data = sock.recv(4096)
-                        if not data:
-                            # Connection closed
-                            return
-                        
-                        # Forward data to the other socket
-                        if sock is client_socket:
-                            server_socket.sendall(data)
+                self._register_pending()
+
+                for key, mask in self._selector.select():
+                    if key.data is None:
+                        if key.fileobj is self._wakeup_r:
+                            self._wakeup_r.recv(4096)
                         else:
-                            client_socket.sendall(data)
-                            
-                    except socket.error as e:
-                        logger.debug(f"Socket error during proxy: {e}")
-                        return
-                    
+                            self._accept()
+                    else:
+                        # Contain per-relay failures: one bad connection
+                        # must not take down the loop for everyone
+                        try:
+                            key.data.handle(key.fileobj, mask)
+                        except Exception as e:
+                            logger.error(f"Error relaying for {key.data.client_address}: {e}")
+                            key.data.close()
+
         except Exception as e:
-            logger.error(f"Error proxying data: {e}")
+            logger.error(f"Error in proxy I/O loop: {e}")
+        finally:
+            for key in list(self._selector.get_map().values()):
+                if key.data is not None:
+                    key.data.close()
+            self._selector.close()
+            for sock in (self.server_socket, self._wakeup_r, self._wakeup_w):
+                if sock:
+                    try:
+                        sock.close()
+                    except OSError:
+                        pass
+
+    def _register_pending(self):
+        """Register newly established connection pairs with the selector."""
+        while self._pending:
+            client_socket, server_socket, client_address = self._pending.popleft()
+            relay = _Relay(self, client_socket, server_socket, client_address)
+            relay.register()
+
+            self.active_connections += 1
+            logger.info(f"Active connections: {self.active_connections}")
+
+    def _connection_closed(self, relay):
+        """Bookkeeping when a relay tears down (runs on the I/O thread)."""
+        self.active_connections -= 1
+        logger.info(f"Connection closed. Active connections: {self.active_connections}")
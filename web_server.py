@@ -1,6 +1,7 @@
 from flask import Flask, render_template, jsonify
 import logging
 import os
+from collections import deque
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -9,36 +10,38 @@ app = Flask(__name__)
 
 # Shared state with main app
 manager_instance = None
-log_buffer = []
 MAX_LOGS = 100
+# Bounded ring buffer: appends past capacity evict the oldest entry in O(1)
+log_buffer = deque(maxlen=MAX_LOGS)
+
+
+# Log level -> display type, built once rather than per record
+LOG_TYPES = {
+    'DEBUG': 'info',
+    'INFO': 'info',
+    'WARNING': 'warning',
+    'ERROR': 'error',
+    'CRITICAL': 'error'
+}
 
 
 class LogHandler(logging.Handler):
-    """Custom log handler to capture logs for web display."""
-    
+    """Custom log handler to capture logs for web display.
+
+    Many threads emit; only /api/logs reads. The bounded deque makes the
+    append side a single atomic operation with no lock of its own.
+    """
+
     def emit(self, record):
         try:
             log_entry = {
                 'timestamp': datetime.fromtimestamp(record.created).strftime('%H:%M:%S'),
                 'message': self.format(record),
-                'type': self.get_log_type(record.levelname)
+                'type': LOG_TYPES.get(record.levelname, 'info')
             }
             log_buffer.append(log_entry)
-            if len(log_buffer) > MAX_LOGS:
-                log_buffer.pop(0)
         except Exception:
             pass
-    
-    def get_log_type(self, levelname):
-        """Map log level to display type."""
-        mapping = {
-            'DEBUG': 'info',
-            'INFO': 'info',
-            'WARNING': 'warning',
-            'ERROR': 'error',
-            'CRITICAL': 'error'
-        }
-        return mapping.get(levelname, 'info')
 
 
 def init_web_server(manager):
@@ -52,10 +55,18 @@ def init_web_server(manager):
     logging.getLogger().addHandler(log_handler)
 
 
+_index_html = None
+
+
 @app.route('/')
 def index():
     """Serve the main dashboard page."""
-    return render_template('index.html')
+    # The dashboard template is static (all state comes via /api/*), so
+    # render it once and serve the cached HTML afterwards
+    global _index_html
+    if _index_html is None:
+        _index_html = render_template('index.html')
+    return _index_html
 
 
 @app.route('/api/status')
@@ -105,7 +116,7 @@ def get_status():
 @app.route('/api/logs')
 def get_logs():
     """Get recent logs."""
-    return jsonify({'logs': log_buffer})
+    return jsonify({'logs': list(log_buffer)})
 
 
 @app.route('/api/start', methods=['POST'])
@@ -173,6 +184,13 @@ def stop_server():
 
 
 def run_web_server(port=8080):
-    """Run the Flask web server."""
+    """Run the web server behind a production WSGI server."""
     logger.info(f"Starting web dashboard on port {port}")
-    app.run(host='0.0.0.0', port=port, debug=False, use_reloader=False)
+    try:
+        from waitress import serve
+    except ImportError:
+        # Dev fallback; waitress is in requirements for deployments
+        logger.warning("waitress not installed, using Flask dev server")
+        app.run(host='0.0.0.0', port=port, debug=False, use_reloader=False)
+        return
+    serve(app, host='0.0.0.0', port=port, threads=4)